@@ -1,12 +1,50 @@
-# pylint: disable=too-many-arguments,line-too-long,no-value-for-parameter
+# pylint: disable=too-many-arguments,line-too-long,no-value-for-parameter,import-outside-toplevel
 """import.py"""
+import os
 import pathlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Manager
 
 import click
-import yaml as Yaml
-
-from rich_utils import info_msg, progress, verbose_msg, warn_msg
-from utils import Journal
+from rich.progress import Progress, TaskID
+
+from rich_utils import get_progress, info_msg, relay_messages, verbose_msg, warn_msg
+from utils import Journal, process_journal_worker
+
+
+def process_journals(files: list[pathlib.Path], progress: Progress, task: TaskID, options: dict) -> list[Journal]:
+    """Process all the journal files, advancing `task` as each journal is done. `options` are passed to each journal"""
+    if len(files) <= 1:
+        # A single journal gains nothing from a worker process
+        journals = []
+        for filename in files:
+            journals.append(Journal.process_journal(progress=progress, journal_path=filename, **options))
+            progress.update(task, advance=1)
+    else:
+        # Journals are independent from each other, so they are processed in parallel.
+        # Only this process draws on the terminal: workers send their messages and progress through a queue
+        with Manager() as manager:
+            queue = manager.Queue()
+            # Tasks added by the workers, by their ID in the worker
+            worker_tasks = {}
+            with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as executor:
+                futures = [
+                    executor.submit(process_journal_worker, queue, journal_path=filename, **options)
+                    for filename in files
+                ]
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    relay_messages(queue, progress, worker_tasks)
+                    progress.update(task, advance=len(done))
+
+            # Workers send everything before returning, so the queue holds their last messages, if any
+            relay_messages(queue, progress, worker_tasks)
+
+        # Keep the journals in the same order as the files
+        journals = [future.result() for future in futures]
+
+    return journals
 
 
 @click.command()
@@ -112,15 +150,19 @@ def convert(
     # Read the config file
     config = {}
     if config_file is not None and config_file.exists():
+        # PyYAML is only needed to read the config file
+        import yaml as Yaml
+
         with config_file.open(encoding="utf-8") as file:
             config: dict = Yaml.safe_load(file)
 
     # Build the list of tags to ignore
     if (tags_to_ignore := config.get("ignore_tags")) is not None and tags_to_ignore:
         ignore_tags += tuple(tags_to_ignore)
-    # Convert a tuple to a set to discard duplicate tags, if any
-    # `filter` discards the `None` tag that's added by default to `ignore_tags` when the option is not passed
-    ignore_tags = set(filter(bool, ignore_tags))
+    # Convert a tuple to a set to discard duplicate tags, if any. Tags are matched case-insensitively
+    # `if tag` discards the `None` tag that's added by default to `ignore_tags` when the option is not passed
+    # Tags from the config file can be numbers, e.g., `2021` is read as an int by YAML
+    ignore_tags = frozenset(str(tag).lower() for tag in ignore_tags if tag)
 
     if verbose > 1 and ignore_tags:
         verbose_msg(f"Ignoring tags: {', '.join(ignore_tags)}")
@@ -128,7 +170,7 @@ def convert(
     # Status tags, if any
     if (tags_as_status := config.get("status_tags")) is not None and tags_as_status:
         status_tags += tuple(tags_as_status)
-    status_tags = set(filter(bool, status_tags))
+    status_tags = frozenset(str(tag).lower() for tag in status_tags if tag)
 
     if verbose > 1 and status_tags:
         info_msg(f"Status tags: {', '.join(status_tags)}")
@@ -138,25 +180,30 @@ def convert(
     if verbose > 0:
         warn_msg("Journal filenames with a leading number will be ignored!")
 
-    journals = []
-
-    with progress:
-        for filename in pathlib.Path(folder).glob("[!0-9]*.json"):
-            journals.append(Journal.process_journal(
-                progress=progress,
-                journal_path=filename,
-                vault_directory=vault_directory or config.get("vault_directory", None),
-                force=force,
-                verbose=verbose,
-                ignore_tags=ignore_tags,
-                status_tags=status_tags,
-                tag_prefix=tag_prefix or config.get("tag_prefix", "#on/"),
-                convert_links=convert_links or config.get("convert_links", False),
-                yaml=yaml or config.get("yaml", False),
-                merge_entries=merge_entries or config.get("merge_entries", False),
-                entries_sep=entries_sep or config.get("entries_sep", "---\n---"),
-                metadata_ext=config.get("metadata", None),
-            ))
+    with os.scandir(folder) as folder_entries:
+        files = [
+            pathlib.Path(file.path)
+            for file in folder_entries
+            if file.name.endswith(".json") and not file.name[0].isdigit() and file.is_file()
+        ]
+    options = {
+        "vault_directory": vault_directory or config.get("vault_directory", None),
+        "force": force,
+        "verbose": verbose,
+        "ignore_tags": ignore_tags,
+        "status_tags": status_tags,
+        "tag_prefix": tag_prefix or config.get("tag_prefix", "#on/"),
+        "convert_links": convert_links or config.get("convert_links", False),
+        "yaml": yaml or config.get("yaml", False),
+        "merge_entries": merge_entries or config.get("merge_entries", False),
+        "entries_sep": entries_sep or config.get("entries_sep", "---\n---"),
+        "metadata_ext": config.get("metadata", None),
+    }
+
+    with get_progress() as progress:
+        task = progress.add_task("[bold green]Processing journals", total=len(files))
+
+        journals = process_journals(files, progress, task, options)
 
         if convert_links or config.get("convert_links", False):
             Journal.convert_dayone_links(journals)
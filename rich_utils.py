@@ -1,28 +1,143 @@
 """Utility module for rich"""
-from functools import partial
+import os
+from functools import cache, partial
+from itertools import count
+from queue import Empty
 
 from rich.console import Console
-from rich.progress import Progress
+from rich.progress import Progress, TaskID
+from rich.style import Style
+from rich.text import Text
 
-# Default console
-console = Console()
 
-# A progress bar
-progress = Progress(console=console)
+# Default console and progress bar.
+# They are built on first use, since creating a console probes the terminal
+@cache
+def get_console() -> Console:
+    """Return the default console"""
+    return Console()
+
+
+@cache
+def get_progress() -> Progress:
+    """Return the default progress bar"""
+    return Progress(console=get_console())
+
+
+# Prefix and style of each message type, built once instead of parsing their markup on every call
+MESSAGE_FORMATS = {
+    "warn": (Text.from_markup(":warning-emoji:  "), Style(color="yellow", bold=True)),
+    "verbose": (Text.from_markup(":exclamation: "), Style(color="red", bold=True)),
+    "info": (Text.from_markup(":information_source: "), Style()),
+}
+
+# Queue to send messages to the parent process, when running in a worker process.
+# Only the parent process draws on the terminal
+_MESSAGE_QUEUE = None
+
+
+def forward_messages(queue) -> None:
+    """Send all the messages printed by this process to `queue`
+
+    The parent process prints them with `relay_messages`
+    """
+    global _MESSAGE_QUEUE  # pylint: disable=global-statement
+    _MESSAGE_QUEUE = queue
+
 
 # Print utils: info, warning, verbose
 def console_print(message: str, _type: str):
     """Print text with rich"""
-    if _type == "warn":
-        console.print(f":warning-emoji:  [b][yellow]{message}[/b][/yellow]")
-    elif _type == "verbose":
-        console.print(f":exclamation: [b][red]{message}[/red][/b]")
-    elif _type == "info":
-        console.print(f":information_source: {message}")
-    else:
-        console.print(message)
+    if _MESSAGE_QUEUE is not None:
+        _MESSAGE_QUEUE.put(("print", message, _type))
+        return
+
+    if _type not in MESSAGE_FORMATS:
+        get_console().print(message)
+        return
+
+    prefix, style = MESSAGE_FORMATS[_type]
+    # Messages can still contain markup, e.g., emoji codes or colors. `render_str` also
+    # highlights them, e.g., numbers and paths, as `print` does with a plain string.
+    # The style of the message type goes on top, like a markup tag around the whole message
+    text = get_console().render_str(message)
+    text.stylize(style)
+    get_console().print(prefix + text)
 
 
 info_msg = partial(console_print, _type="info")
 warn_msg = partial(console_print, _type="warn")
 verbose_msg = partial(console_print, _type="verbose")
+
+
+class QueueProgress:
+    """Stand-in for `Progress` in a worker process
+
+    Tasks and their updates are sent to the parent process through a queue
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.task_ids = count()
+
+    def add_task(self, description: str, total: float | None = None) -> tuple[int, int]:
+        """Ask the parent process to add a task. The returned ID is unique across all workers"""
+        task_id = (os.getpid(), next(self.task_ids))
+        self.queue.put(("add_task", task_id, description, total))
+        return task_id
+
+    def update(self, task_id: tuple[int, int], advance: float) -> None:
+        """Ask the parent process to advance a task"""
+        self.queue.put(("update", task_id, advance))
+
+
+class BatchedTask:
+    """A progress task that is advanced in batches of steps rather than at every single step
+
+    With a `QueueProgress`, each update is a message to the parent process,
+    so batching keeps the queue traffic low
+    """
+
+    def __init__(
+        self,
+        progress: Progress | QueueProgress,
+        task_id: TaskID | tuple[int, int],
+        every: int = 128,
+    ):
+        self.progress = progress
+        self.task_id = task_id
+        self.every = every
+        self.pending = 0
+
+    def tick(self) -> None:
+        """Count one step, and advance the task once a whole batch is pending"""
+        self.pending += 1
+        if self.pending >= self.every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Advance the task by all the pending steps"""
+        if self.pending:
+            self.progress.update(self.task_id, advance=self.pending)
+            self.pending = 0
+
+
+def relay_messages(queue, progress: Progress, tasks: dict[tuple[int, int], TaskID]) -> None:
+    """Print the messages and apply the progress updates sent by workers, until `queue` is empty
+
+    `tasks` maps the task IDs of the worker processes to the tasks of `progress`
+    """
+    while True:
+        try:
+            kind, *args = queue.get_nowait()
+        except Empty:
+            return
+
+        if kind == "print":
+            console_print(*args)
+        elif kind == "add_task":
+            task_id, description, total = args
+            tasks[task_id] = progress.add_task(description, total=total)
+        else:
+            task_id, advance = args
+            progress.update(tasks[task_id], advance=advance)
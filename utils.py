@@ -1,18 +1,44 @@
 # pylint: disable=too-many-nested-blocks,too-many-branches,too-many-locals,line-too-long,invalid-name,consider-using-f-string,no-member
 """utils.py"""
 import json
+import mmap
+import os
 import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import BinaryIO
 
-import dateutil.parser
 import pytz
 from attrs import define, field
 from rich.progress import Progress
-from functools import cached_property
+from functools import cached_property, lru_cache
 
-from rich_utils import info_msg, verbose_msg, warn_msg
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from ciso8601 import parse_datetime as parse_iso_datetime
+except ImportError:
+
+    def parse_iso_datetime(date: str) -> datetime:
+        """Parse an ISO-8601 date. `fromisoformat` accepts a trailing 'Z' only from Python 3.11"""
+        return datetime.fromisoformat(date.replace("Z", "+00:00"))
+
+from rich_utils import BatchedTask, QueueProgress, forward_messages, info_msg, verbose_msg, warn_msg
+
+# The regex to match a dayone internal link: [link_text](dayone://view?EntryId=uuid)
+DAYONE_LINK_REGEX = re.compile(r"\[([^\]]*?)\]\([<]?dayone2?:\/\/.*?([A-F0-9]+)[>]?\)")
+# Characters of the entry text to remove or replace, all in a single pass
+TEXT_TRANSLATION = str.maketrans({"\\": "", "\u2028": "\n", "\u1C6A": "\n\n", "\u200b": ""})
+# DayOne breaks multi-line code blocks in many lines with triple ``` delimiters
+CODE_BLOCK_REGEX = re.compile(r"```\s+```", flags=re.MULTILINE)
+# The regex to match a link to an attachment: ![](dayone-moment://[kind/]identifier)
+# The kind is missing for photos, otherwise it's one of 'pdfAttachment', 'audio', or 'video'
+ATTACHMENT_REGEX = re.compile(r"\!\[\]\(dayone-moment:\/+(?:(pdfAttachment|audio|video)\/)?([A-F0-9]+)\)")
 
 
 @define
@@ -27,23 +53,21 @@ class Entry:
     output_file: Path = field(default=None, eq=False)
 
     def __str__(self) -> str:
+        return f"{self.header()}{self.text}\n"
+
+    def header(self) -> str:
+        """The YAML frontmatter, or the metadata, that precedes the entry's text"""
         if self.has_yaml:
-            self.yaml = "---\n{yaml_block}\n---\n\n".format(
-                yaml_block="\n".join(
-                    [
-                        f"""{name.lower().replace(' ', '_')}: {"'" + value.replace("'", "''") + "'" if isinstance(value, str) else value}"""
-                        for name, value in self.metadata.items()
-                    ]
-                )
-            )
-            metadata = []
-        else:
-            metadata = [f"{key}:: {value}" for key, value in self.metadata.items()]
-            metadata.extend(["", ""]) # this will add two new lines after the metadata
+            lines = []
+            for name, value in self.metadata.items():
+                if isinstance(value, str):
+                    value = "'" + value.replace("'", "''") + "'"
+                lines.append(f"{name.lower().replace(' ', '_')}: {value}")
+            self.yaml = "---\n" + "\n".join(lines) + "\n---\n\n"
+            return self.yaml
 
-        return "{yaml}{metadata}{text}\n".format(
-            yaml=self.yaml, metadata="\n".join(metadata), text=self.text
-        )
+        # the last newline adds an empty line after the metadata
+        return "".join(f"{key}:: {value}\n" for key, value in self.metadata.items()) + "\n"
 
     @classmethod
     def from_metadata(cls, metadata: dict, yaml: bool = False) -> "Entry":
@@ -65,72 +89,137 @@ class Entry:
         """Write out entry to a file"""
         if self.output_file is None:
             raise RuntimeError("Entry output file is undefined!")
-        with self.output_file.open("w", encoding="utf-8") as file:
-            file.write(f"{self}")
+        # Encoding up front skips the text layer of `open`, only a raw binary write is left
+        self.output_file.write_bytes(str(self).encode("utf-8"))
 
 
 def capwords(string: str, sep: str = "") -> str:
     """Capitalize the first letter of each word in a string"""
-    return sep.join(word[0].upper() + word[1:].lower() for word in string.split(" "))
+    # Empty words, from consecutive spaces, are skipped
+    return sep.join(word.capitalize() for word in string.split(" ") if word)
+
+
+def replace_attachment_links(text: str, extensions: dict[tuple[str | None, str], str]) -> str:
+    """Replace DayOne links to attachments with Obsidian embeds. Links to unknown attachments are left untouched"""
+
+    def replace_link(match: re.Match) -> str:
+        """A replacement function for links to attachments"""
+        kind, identifier = match.groups()
+        if (extension := extensions.get((kind, identifier))) is None:
+            return match[0]
+        return f"![[{identifier}.{extension}]]"
+
+    return ATTACHMENT_REGEX.sub(replace_link, text)
+
+
+def queue_attachment_rename(
+    folder: str,
+    original_name: str,
+    renamed_name: str,
+    existing_files: set[str],
+    pending_renames: list[tuple[str, str]],
+    verbose: int,
+) -> None:
+    """Queue the renaming of an attachment file from its md5 to its identifier, if it's among the existing files of its folder"""
+    if original_name not in existing_files:
+        return
+    existing_files.discard(original_name)
+
+    original_file = os.path.join(folder, original_name)
+    renamed_file = os.path.join(folder, renamed_name)
+    if verbose > 1:
+        verbose_msg(f"Renaming {original_file} to {renamed_file}")
+    pending_renames.append((original_file, renamed_file))
+
+
+def rename_file(original_file: str, renamed_file: str) -> None:
+    """Rename a file, unless it has already been renamed"""
+    try:
+        os.rename(original_file, renamed_file)
+    except FileNotFoundError:
+        # The same attachment can belong to another journal, processed in parallel, which has already renamed it
+        pass
+
+
+def load_json(json_file: BinaryIO) -> dict:
+    """Parse a JSON file opened in binary mode
+
+    `orjson` parses the memory-mapped file directly, so the file contents are never copied in memory.
+    Both `orjson` and `json` accept bytes, so there's no need to decode the file first
+    """
+    # An empty file cannot be memory-mapped: `json` reports it with the usual decoding error
+    if orjson is None or os.fstat(json_file.fileno()).st_size == 0:
+        return json.loads(json_file.read())
+
+    with mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+        try:
+            return orjson.loads(view)
+        except orjson.JSONDecodeError:
+            # `orjson` is stricter than `json`: it rejects NaN, Infinity, and lone surrogates such as "\ud83d".
+            # This rescues journals with NaN or Infinity values, or with lone surrogates only in fields that
+            # aren't written out, e.g., the rich text. A lone surrogate in an entry's text still fails when
+            # the entry is written, as it always did
+            return json.loads(bytes(view))
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str) -> pytz.BaseTzInfo:
+    """Return the timezone with the given name. Journals use only a few timezones, so they are cached"""
+    return pytz.timezone(name)
 
 
 # TODO: refactor this function into a method of the Entry class
 def retrieve_metadata(
     entry: dict,
     local_date: datetime,
+    file_date_format: str,
     tag_prefix: str,
-    ignore_tags: set,
-    status_tags: set,
+    ignore_tags: frozenset,
+    status_tags: frozenset,
     extra_tags: list,
     verbose: int,
-    journal_name: str,
+    journal_tag: str | None,
+    tags_cache: dict[str, str],
 ) -> dict:
-    """Fetch the metadata of a single journal entry"""
+    """Fetch the metadata of a single journal entry
+
+    `file_date_format` is the local date formatted as YYYY-MM-DD.
+    `journal_tag` is the tag for the journal name, formatted once per journal
+    `tags_cache` maps a lowercase tag to its Obsidian form, and is shared across all the entries of a journal
+    """
     metadata = {}
     metadata["uuid"] = entry["uuid"]
 
     # Add raw create datetime adjusted for timezone and identify timezone
-    metadata["dates"] = local_date.strftime("%Y-%m-%d %H:%M:%S")
+    metadata["dates"] = f"{file_date_format} {local_date.hour:02d}:{local_date.minute:02d}:{local_date.second:02d}"
     # metadata["timezone"] = entry["timeZone"]
 
     # Add location
     location = []
-    try:
-        location = list(
-            filter(
-                bool,
-                [
-                    entry["location"].get(key, None)
-                    for key in (
-                        "placeName",
-                        "localityName",
-                        "administrativeArea",
-                        "country",
-                    )
-                ],
-            )
+    if (location_data := entry.get("location")) is not None:
+        location = [
+            value
+            for key in ("placeName", "localityName", "administrativeArea", "country")
+            if (value := location_data.get(key))
+        ]
+    elif verbose > 1:
+        verbose_msg(
+            f"Entry with date '{file_date_format}' has no location!"
         )
-    except KeyError:
-        if verbose and verbose > 1:
-            verbose_msg(
-                f"Entry with date '{local_date.strftime('%Y-%m-%d')}' has no location!"
-            )
 
     metadata["places"] = ", ".join(location)
 
     # Add GPS, not all entries have this
-    if "location" in entry and all(
-        ["latitude" in entry["location"], "longitude" in entry["location"]]
-    ):
-        loc = entry["location"]
-        metadata["location"] = [loc.get('latitude'), loc.get('longitude')]
+    if location_data is not None and "latitude" in location_data and "longitude" in location_data:
+        metadata["location"] = [location_data["latitude"], location_data["longitude"]]
 
     # Add weather information if present
-    if "weather" in entry and all(
-        i in entry["weather"]
-        for i in ["weatherCode", "temperatureCelsius", "windSpeedKPH"]
+    if (
+        (weather := entry.get("weather")) is not None
+        and "weatherCode" in weather
+        and "temperatureCelsius" in weather
+        and "windSpeedKPH" in weather
     ):
-        weather = entry["weather"]
         metadata[
             "weather"
         ] = f"{weather['weatherCode']}, {round(weather['temperatureCelsius'], 1)}°C, {round(weather['windSpeedKPH'], 1)} km/h wind"
@@ -139,21 +228,29 @@ def retrieve_metadata(
     tags = []
 
     # First tag is the journal name, if present
-    if journal_name is not None:
-        tags.append(capwords(f"#journal/{journal_name}"))
+    if journal_tag is not None:
+        tags.append(journal_tag)
 
     if (entry_tags := entry.get("tags", None)) is not None:
-        entry_tags = set(entry_tags)
-
-        for tag in (entry_tags - ignore_tags) - status_tags:
-            # format the tag: remove spaces and capitalize each word
-            # Example: #Original tag --> #{prefix}/originalTag
-            new_tag = capwords(f"{tag_prefix}{tag}")
-            tags.append(new_tag)
+        # Tags are compared in lowercase: their case is normalized by `capwords` anyway
+        entry_tags = {tag.lower() for tag in entry_tags}
+        # Status tags go after all the regular ones
+        entry_status_tags = []
+
+        for tag in entry_tags:
+            # Status tags are kept even if they are ignored
+            if (is_status := tag in status_tags) or tag not in ignore_tags:
+                # format the tag: remove spaces and capitalize each word
+                # Example: #Original tag --> #{prefix}/originalTag, or #status/originalTag for a status tag.
+                # A tag is either a status tag or a regular one, so they can share the cache
+                if (new_tag := tags_cache.get(tag)) is None:
+                    new_tag = tags_cache[tag] = capwords(f"{'#status/' if is_status else tag_prefix}{tag}")
+                if is_status:
+                    entry_status_tags.append(new_tag)
+                else:
+                    tags.append(new_tag)
 
-        # Handle status tags
-        if status_tags := entry_tags & status_tags:
-            tags.extend(map(lambda tag: capwords("#status/" + tag), status_tags))
+        tags.extend(entry_status_tags)
 
     # Add a tag for the location to make places searchable in Obsidian
     if location:
@@ -186,7 +283,7 @@ class Journal:
     @classmethod
     def process_journal(
         cls,
-        progress: Progress,
+        progress: Progress | QueueProgress,
         journal_path: Path,
         vault_directory: Path,
         tag_prefix: str,
@@ -196,8 +293,8 @@ class Journal:
         force: bool,
         merge_entries: bool,
         entries_sep: str,
-        ignore_tags: set,
-        status_tags: set,
+        ignore_tags: frozenset,
+        status_tags: frozenset,
         metadata_ext: dict,
     ) -> "Journal":
         """Process a journal JSON file"""
@@ -219,62 +316,113 @@ class Journal:
         # All entries processed will be added to a dictionary
         entries = {}
         merged_entries = 0
-
-        with open(journal_path, encoding="utf-8") as json_file:
-            data: dict = json.load(json_file)
-
-            task = progress.add_task(
-                f"[bold green]Processing entries of '[cyan][not bold]{journal_path.name}[/not bold][/cyan]'",
-                total=len(data["entries"]),
+        # Text chunks of merged entries, joined once all entries have been processed.
+        # Each merge only adds chunks, instead of copying the whole text merged so far.
+        # Chunks are collected in reverse order: from the newest entry to the oldest, the merged text of a date is
+        # `text_n, sep, header_n-1, text_n-1, ..., sep, header_1, text_1`, followed by one newline per merge
+        merged_chunks: dict[str, list[str]] = {}
+        # Number of entries with the same date that got a marker appended to their filename
+        collision_counts: dict[str, int] = {}
+        # Month folders created so far, and their path relative to the vault, to build each of them only once
+        month_dirs: dict[str, tuple[Path, str]] = {}
+
+        # Names of the files in each attachment folder. The folders are listed once,
+        # instead of checking whether each attachment exists before renaming it
+        # Folders are kept as strings: building a `Path` for each attachment is comparatively slow
+        attachment_dirs = {}
+        attachment_files = {}
+        for folder_name in ("photos", "pdfs", "audios", "videos"):
+            folder = attachment_dirs[folder_name] = os.path.join(base_folder, folder_name)
+            attachment_files[folder_name] = {file.name for file in os.scandir(folder)} if os.path.isdir(folder) else set()
+
+        # Attachments to rename, as (original, renamed) paths. They are renamed all at once after the entries
+        pending_renames = []
+
+        # Files of this journal already present in the vault directory, relative to the vault.
+        # The journal's folder is listed once, instead of checking whether each entry exists in the vault
+        vault_files: set[str] = set()
+        if vault_directory is not None and not force:
+            vault_root = os.path.expanduser(vault_directory)
+            for dirpath, _, filenames in os.walk(os.path.join(vault_root, journal_name)):
+                vault_dir = os.path.relpath(dirpath, vault_root)
+                vault_files.update(os.path.join(vault_dir, filename) for filename in filenames)
+
+        with open(journal_path, "rb") as json_file:
+            raw_entries: list[dict] = load_json(json_file)["entries"]
+            total_base_entries = len(raw_entries)
+
+            # In a worker process, progress updates go through a queue: they are sent in batches, not once per entry
+            task = BatchedTask(
+                progress,
+                progress.add_task(
+                    f"[bold green]Processing entries of '[cyan][not bold]{journal_path.name}[/not bold][/cyan]'",
+                    total=total_base_entries,
+                ),
             )
 
-            # Are there additional tags in the config file?
+            # Obsidian form of the tags found so far: most tags are shared by many entries
+            tags_cache = {}
+            # The journal tag is the same for all entries
+            journal_tag = capwords(f"#journal/{journal_name}")
+
+            # Are there additional tags in the config file? They're added to the entries of every journal.
+            # The config is shared by all journals, so it's left untouched
+            extra_tags = None
+            extra_metadata = None
             if metadata_ext is not None:
-                extra_tags = metadata_ext.pop("tags", None)
-            else:
-                extra_tags = None
+                extra_tags = metadata_ext.get("tags")
+                extra_metadata = {key: value for key, value in metadata_ext.items() if key != "tags"}
+
+            # Raw entries are consumed one by one, so that each can be freed as soon as it has been processed.
+            # The list is reversed first to pop entries in their original order
+            raw_entries.reverse()
 
             entry: dict
-            for entry in data["entries"]:
-                creation_date = dateutil.parser.isoparse(entry["creationDate"])
+            while raw_entries:
+                entry = raw_entries.pop()
+                creation_date = parse_iso_datetime(entry["creationDate"])
                 local_date = creation_date.astimezone(
-                    pytz.timezone(entry["timeZone"])
+                    get_timezone(entry["timeZone"])
                 )  # It's natural to use our local date/time as reference point, not UTC
+                # Dates are formatted by hand, which is much faster than `strftime` on timezone-aware datetimes
+                file_date_format = f"{local_date.year:04d}-{local_date.month:02d}-{local_date.day:02d}"
+                month_format = f"{creation_date.year:04d}-{creation_date.month:02d}"
 
                 # Fetch entry's metadata
                 metadata = retrieve_metadata(
                     entry,
                     local_date,
+                    file_date_format,
                     tag_prefix,
                     extra_tags=extra_tags,
                     ignore_tags=ignore_tags,
                     status_tags=status_tags,
-                    journal_name=journal_name,
+                    journal_tag=journal_tag,
                     verbose=verbose,
+                    tags_cache=tags_cache,
                 )
 
                 # Create a new Entry and add metadata
                 new_entry = Entry.from_metadata(metadata, yaml=yaml)
 
                 # Add any other metadata field found in the config file
-                if metadata_ext is not None:
-                    new_entry.metadata.update(metadata_ext)
+                if extra_metadata:
+                    new_entry.metadata.update(extra_metadata)
 
                 # Add body text if it exists (entries can have a "blank body" sometimes), after some tidying up
                 entry_text: str
                 if (entry_text := entry.get("text", None)) is not None:
-                    new_text = entry_text.replace("\\", "")
-                    new_text = new_text.replace("\u2028", "\n")
-                    new_text = new_text.replace("\u1C6A", "\n\n")
-                    new_text = new_text.replace("\u200b", "")
+                    new_text = entry_text.translate(TEXT_TRANSLATION)
                     # TODO: fix multiple, consecutive newlines as well, e.g., \n\n\n\n -> \n
 
                     # Fixes multi-line ```code blocks```
                     # DayOne breaks these block in many lines with a triple ``` delimiters.
                     # This results in a bad formatting of the Markdown output.
-                    new_text = re.sub(r"```\s+```", "", new_text, flags=re.MULTILINE)
+                    new_text = CODE_BLOCK_REGEX.sub("", new_text)
 
                     # Handling attachments: photos, audios, videos, and documents (PDF)
+                    # Extension of each attachment, by kind and identifier, to fix all the links in a single pass
+                    extensions = {}
 
                     if "photos" in entry:
                         # Correct photo links. The filename is the md5 code, not the identifier used in the text
@@ -287,147 +435,108 @@ class Journal:
                                          " Skipping as it is probably missing.")
                                 continue
 
-                            original_photo_file = (
-                                base_folder / "photos" / f"{photo['md5']}.{image_type}"
-                            )
-                            renamed_photo_file = (
-                                base_folder
-                                / "photos"
-                                / f"{photo['identifier']}.{image_type}"
-                            )
-                            if original_photo_file.exists():
-                                if verbose > 1:
-                                    verbose_msg(
-                                        f"Renaming {original_photo_file} to {renamed_photo_file}"
-                                    )
-                                original_photo_file.rename(renamed_photo_file)
-
-                            new_text = re.sub(
-                                r"(\!\[\]\(dayone-moment:\/\/)([A-F0-9]+)\)",
-                                (rf"![[\2.{image_type}]]"),
-                                new_text,
+                            queue_attachment_rename(
+                                attachment_dirs["photos"],
+                                f"{photo['md5']}.{image_type}",
+                                f"{photo['identifier']}.{image_type}",
+                                attachment_files["photos"],
+                                pending_renames,
+                                verbose,
                             )
 
+                            extensions[None, photo["identifier"]] = image_type
+
                     if "pdfAttachments" in entry:
                         # Correct photo pdf links. Similar to what is done on photos
                         for pdf in entry["pdfAttachments"]:
-                            original_pdf_file = base_folder / "pdfs" / f"{pdf['md5']}.pdf"
-                            renamed_pdf_file = (
-                                base_folder / "pdfs" / f"{pdf['identifier']}.pdf"
-                            )
-                            if original_pdf_file.exists():
-                                if verbose > 1:
-                                    verbose_msg(
-                                        f"Renaming {original_pdf_file} to {renamed_pdf_file}"
-                                    )
-                                original_pdf_file.rename(renamed_pdf_file)
-
-                            new_text = re.sub(
-                                r"(\!\[\]\(dayone-moment:\/+pdfAttachment\/)([A-F0-9]+)\)",
-                                r"![[\2.pdf]]",
-                                new_text,
+                            queue_attachment_rename(
+                                attachment_dirs["pdfs"],
+                                f"{pdf['md5']}.pdf",
+                                f"{pdf['identifier']}.pdf",
+                                attachment_files["pdfs"],
+                                pending_renames,
+                                verbose,
                             )
 
+                            extensions["pdfAttachment", pdf["identifier"]] = "pdf"
+
                     if "audios" in entry:
                         for audio in entry["audios"]:
                             # Audio type is missing in DayOne JSON
                             # AAC files are very often saved with .m4a extension
                             audio_format = "m4a"
-                            original_audio_file = (
-                                base_folder / "audios" / f"{audio['md5']}.{audio_format}"
-                            )
-                            renamed_audio_file = (
-                                base_folder
-                                / "audios"
-                                / f"{audio['identifier']}.{audio_format}"
-                            )
-                            if original_audio_file.exists():
-                                if verbose > 1:
-                                    verbose_msg(
-                                        f"Renaming {original_audio_file} to {renamed_audio_file}"
-                                    )
-                                original_audio_file.rename(renamed_audio_file)
-
-                            new_text = re.sub(
-                                r"(\!\[\]\(dayone-moment:\/+audio/)([A-F0-9]+)\)",
-                                rf"![[\2.{audio_format}]]",
-                                new_text,
+                            queue_attachment_rename(
+                                attachment_dirs["audios"],
+                                f"{audio['md5']}.{audio_format}",
+                                f"{audio['identifier']}.{audio_format}",
+                                attachment_files["audios"],
+                                pending_renames,
+                                verbose,
                             )
 
+                            extensions["audio", audio["identifier"]] = audio_format
+
                     if "videos" in entry:
                         for video in entry["videos"]:
                             video_format = video["type"]
-                            original_video_file = (
-                                base_folder / "videos" / f"{video['md5']}.{video_format}"
-                            )
-                            renamed_video_file = (
-                                base_folder
-                                / "videos"
-                                / f"{video['identifier']}.{video_format}"
-                            )
-                            if original_video_file.exists():
-                                if verbose > 1:
-                                    verbose_msg(
-                                        f"Renaming {original_video_file} to {renamed_video_file}"
-                                    )
-                                original_video_file.rename(renamed_video_file)
-
-                            new_text = re.sub(
-                                r"(\!\[\]\(dayone-moment:\/+video/)([A-F0-9]+)\)",
-                                rf"![[\2.{video_format}]]",
-                                new_text,
+                            queue_attachment_rename(
+                                attachment_dirs["videos"],
+                                f"{video['md5']}.{video_format}",
+                                f"{video['identifier']}.{video_format}",
+                                attachment_files["videos"],
+                                pending_renames,
+                                verbose,
                             )
 
+                            extensions["video", video["identifier"]] = video_format
+
+                    if extensions:
+                        new_text = replace_attachment_links(new_text, extensions)
+
                     new_entry.text = new_text
 
                 # Save entries organised by year, year-month, year-month-day.md
-                year_dir = journal_folder / str(creation_date.year)
-                month_dir = year_dir / creation_date.strftime("%Y-%m")
-                if not month_dir.is_dir():
-                    month_dir.mkdir(parents=True)
+                if (month_paths := month_dirs.get(month_format)) is None:
+                    month_dir = journal_folder / str(creation_date.year) / month_format
+                    month_dir.mkdir(parents=True, exist_ok=True)
+                    # Relative path of the folder in the vault directory
+                    month_dir_rel = os.path.join(journal_name, str(creation_date.year), month_format)
+                    month_paths = month_dirs[month_format] = (month_dir, month_dir_rel)
+                month_dir, month_dir_rel = month_paths
 
                 # Target filename to save to
-                file_date_format = local_date.strftime("%Y-%m-%d")
-                target_file = month_dir / f"{file_date_format}.md"
-                new_entry.output_file = target_file
+                target_stem = file_date_format
 
                 # Relative path, to check if this entry is already present in the vault directory
-                target_file_rel = (
-                    Path(journal_name)
-                    / f"{creation_date.strftime('%Y/%Y-%m')}"
-                    / f"{file_date_format}.md"
-                )
+                target_file_rel = os.path.join(month_dir_rel, f"{target_stem}.md")
 
                 # Skip files already present in the vault directory
-                if (
-                    vault_directory is None
-                    or force
-                    or not (Path(vault_directory).expanduser() / target_file_rel).exists()
-                ):
+                if target_file_rel not in vault_files:
                     # Here is where we handle multiple entries on the same day. Each goes to it's own file
-                    if target_file.stem in entries:
+                    if target_stem in entries:
                         if verbose > 1:
                             warn_msg(
-                                f"Found another entry with the same date '{target_file.stem}'"
+                                f"Found another entry with the same date '{target_stem}'"
                             )
                         if merge_entries:
                             merged_entries += 1
-                            prev_entry: Entry = entries.pop(target_file.stem)
-                            del prev_entry.metadata["dates"]
-                            new_entry.text += f"\n\n{entries_sep}\n\n{prev_entry}"
+                            # Replaced in place below, so a lookup is enough
+                            prev_entry: Entry = entries[target_stem]
+                            prev_entry.metadata.pop("dates", None)
+                            # Same as `new_entry.text += f"\n\n{entries_sep}\n\n{prev_entry}"`
+                            # The trailing newline of `str(prev_entry)` is added when the chunks are joined
+                            chunks = merged_chunks.setdefault(target_stem, [prev_entry.text])
+                            chunks += (prev_entry.header(), f"\n\n{entries_sep}\n\n", new_entry.text)
                         else:
                             # File exists, need to find the next in sequence and append alpha character marker
-                            index = 97  # ASCII a
-                            target_file = month_dir / f"{file_date_format}{chr(index)}.md"
-                            while target_file.stem in entries:
-                                index += 1
-                                target_file = (
-                                    month_dir / f"{file_date_format}{chr(index)}.md"
-                                )
-                            new_entry.output_file = target_file
+                            # Markers are assigned in order, so counting the collisions gives the next one
+                            collisions = collision_counts.get(file_date_format, 0)
+                            collision_counts[file_date_format] = collisions + 1
+                            target_stem = f"{file_date_format}{chr(97 + collisions)}"  # ASCII a
 
                     # Add current entry's to entries dict
-                    entries[target_file.stem] = new_entry
+                    new_entry.output_file = month_dir / f"{target_stem}.md"
+                    entries[target_stem] = new_entry
 
                 else:
                     if verbose > 1:
@@ -435,27 +544,42 @@ class Journal:
                             f"File '{target_file_rel}' already exists in vault directory!"
                         )
 
-                progress.update(task, advance=1)
+                task.tick()
+
+            task.flush()
+
+        # Renames are independent from each other, so their system calls can overlap
+        if pending_renames:
+            with ThreadPoolExecutor(max_workers=min(32, len(pending_renames))) as executor:
+                # Consume the results, to raise any unexpected error
+                list(executor.map(rename_file, *zip(*pending_renames)))
+
+        for stem, chunks in merged_chunks.items():
+            # Each merge added three chunks after the oldest entry's text
+            entries[stem].text = "".join(reversed(chunks)) + "\n" * (len(chunks) // 3)
 
         journal = cls(entries=entries, path=journal_path, merge_entries=merge_entries, merged_entries=merged_entries, 
-                      total_base_entries=len(data["entries"]), convert_links=convert_links, 
+                      total_base_entries=total_base_entries, convert_links=convert_links, 
                       base_folder=base_folder, journal_folder=journal_folder)
         return journal
 
     @cached_property
-    def uuid_to_file(self) -> dict[str, Path]:
-        return {entry.uuid: entry.output_file.relative_to(self.base_folder) for entry in self.entries.values()}
+    def uuid_to_file(self) -> dict[str, str]:
+        """Path of each entry's file relative to the base folder, with forward slashes as used by Obsidian links"""
+        return {entry.uuid: entry.output_file.relative_to(self.base_folder).as_posix() for entry in self.entries.values()}
 
     def dump(self) -> None:
         """Write all entries in the journal to files"""
 
         # Rename JSON file to avoid reprocessing if the script is run twice
-        num_files = len(list(self.base_folder.glob(f"*{self.path.stem}.json")))
+        with os.scandir(self.base_folder) as files:
+            num_files = sum(1 for file in files if file.name.endswith(self.path.name))
         self.path.rename(self.base_folder / f"{num_files - 1}_{self.path.name}")
 
-        entry: Entry
-        for entry in self.entries.values():
-            entry.dump()
+        # Each entry is written to its own file, so the writes can overlap
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            # Consume the results, to raise any error
+            list(executor.map(Entry.dump, self.entries.values()))
 
         info_msg(
             f":white_check_mark: {len(self.entries)}/{self.total_base_entries}{f' ({self.merged_entries} merged)' if self.merge_entries else ''} entries have been exported to '{self.journal_folder}'"
@@ -470,13 +594,12 @@ class Journal:
         # Step 1: build a list of all UUIDs and corresponding filenames
         uuids_to_filenames = {}
         for journal in journals:
-            uuids_to_filenames = uuids_to_filenames | journal.uuid_to_file
+            uuids_to_filenames.update(journal.uuid_to_file)
 
         def replace_link(match: re.Match) -> str:
             """A replacement function for dayone internal links"""
             link_text, uuid = match.groups()
-            if uuid in uuids_to_filenames:
-                file_path = uuids_to_filenames[uuid].as_posix() # convert to forward slashes
+            if (file_path := uuids_to_filenames.get(uuid)) is not None:
                 return f"[[{file_path}|{link_text}]]"
             return f"^[Linked entry with UUID `{uuid}` not found]"
 
@@ -484,7 +607,12 @@ class Journal:
         for journal in journals:
             entry: Entry
             for entry in journal.entries.values():
-                # The regex to match a dayone internal link: [link_text](dayone://view?EntryId=uuid)
-                entry.text = re.sub(
-                    r"\[([^\]]*?)\]\([<]?dayone2?:\/\/.*?([A-F0-9]+)[>]?\)", replace_link, entry.text
-                )
+                # A plain substring search is much faster than the regex, and most entries have no links
+                if "dayone" in entry.text:
+                    entry.text = DAYONE_LINK_REGEX.sub(replace_link, entry.text)
+
+
+def process_journal_worker(queue, journal_path: Path, **kwargs) -> Journal:
+    """Process a journal in a worker process. Its messages and progress are sent through `queue` to the parent process"""
+    forward_messages(queue)
+    return Journal.process_journal(progress=QueueProgress(queue), journal_path=journal_path, **kwargs)